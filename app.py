@@ -1,18 +1,205 @@
 import streamlit as st
 import os
 import sys
-from datetime import datetime, time
-import time as time_module
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
 import threading
 
 # Adicionar o diretório tasks ao path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'tasks'))
 
-# Importar módulos de tarefas
-from tasks.file_organizer import FileOrganizer
-from tasks.scheduler import TaskScheduler
-from tasks.report_generator import ReportGenerator
-from tasks.form_filler import FormFiller
+# Os módulos de tarefas são importados só quando a página correspondente precisa
+# deles: eles puxam pandas, numpy, openpyxl e pyautogui (que exige display).
+# Uma instância só é compartilhada (st.cache_resource) quando todo acesso a ela
+# passa por uma trava do processo (TaskScheduler, FormFiller); as que rodam em
+# paralelo no pool de jobs (FileOrganizer, ReportGenerator) são criadas por job.
+
+# Jobs em segundo plano: limite de execuções simultâneas no servidor (todas as
+# sessões), intervalo de atualização do status e tempo de retenção dos concluídos
+MAX_JOB_WORKERS = 4
+JOB_POLL_SECONDS = 2
+JOB_RETENTION = timedelta(hours=1)
+
+JOB_STATUS_LABELS = {
+    "queued": "⏳ Na fila",
+    "running": "🔄 Executando",
+    "done": "✅ Concluído",
+    "error": "❌ Erro",
+    "cancelled": "🚫 Cancelado"
+}
+
+@st.cache_resource
+def get_job_runner():
+    """Pool de workers e registro de jobs, compartilhados por todas as sessões"""
+    return {
+        "executor": ThreadPoolExecutor(max_workers=MAX_JOB_WORKERS, thread_name_prefix="job"),
+        "jobs": {},
+        "lock": threading.Lock()
+    }
+
+def run_job(job, func, *args, **kwargs):
+    """Executa o job no worker, publicando o status no registro"""
+    if job["cancel_event"].is_set():
+        job.update(status="cancelled", message="Cancelado antes de iniciar", finished_at=datetime.now())
+        return
+    
+    # A partir daqui o job não é mais cancelável e mantém seu resultado real
+    job.update(status="running", message="Executando...", started_at=datetime.now())
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        job.update(status="error", error=str(e), message="Falhou")
+    else:
+        job.update(status="done", result=result, progress=100, message="Concluído")
+    finally:
+        job["finished_at"] = datetime.now()
+
+def paths_overlap(path_a, path_b):
+    """Indica se os caminhos são iguais ou se um contém o outro"""
+    try:
+        return os.path.commonpath([path_a, path_b]) in (path_a, path_b)
+    except ValueError:
+        # Caminhos em unidades diferentes (Windows)
+        return False
+
+def submit_job(kind, description, func, *args, paths=(), **kwargs):
+    """Envia func ao pool e retorna o ID do job, ou None se as pastas em paths já estão em uso"""
+    runner = get_job_runner()
+    job_id = uuid.uuid4().hex[:8]
+    paths = [os.path.realpath(path) for path in paths]
+    job = {
+        "id": job_id,
+        "kind": kind,
+        "description": description,
+        "status": "queued",
+        "progress": 0,
+        "message": "Aguardando worker livre...",
+        "result": None,
+        "error": None,
+        "created_at": datetime.now(),
+        "started_at": None,
+        "finished_at": None,
+        "cancel_event": threading.Event(),
+        "future": None,
+        "paths": paths
+    }
+    
+    with runner["lock"]:
+        # Descartar jobs concluídos há muito tempo (inclusive de sessões encerradas)
+        limit = datetime.now() - JOB_RETENTION
+        for old_id, old_job in list(runner["jobs"].items()):
+            if old_job["finished_at"] and old_job["finished_at"] < limit:
+                del runner["jobs"][old_id]
+        
+        # Dois jobs mexendo nas mesmas pastas disputariam os mesmos arquivos
+        for other in runner["jobs"].values():
+            if other["finished_at"] is None and any(
+                paths_overlap(path, other_path) for path in paths for other_path in other["paths"]
+            ):
+                return None
+        
+        runner["jobs"][job_id] = job
+    
+    job["future"] = runner["executor"].submit(run_job, job, func, *args, **kwargs)
+    st.session_state.setdefault("job_ids", []).append(job_id)
+    return job_id
+
+def cancel_job(job_id):
+    """Cancela um job que ainda está na fila; jobs em execução seguem até o fim"""
+    job = get_job_runner()["jobs"].get(job_id)
+    if job is None or job["status"] != "queued":
+        return
+    
+    job["cancel_event"].set()
+    if job["future"] is not None and job["future"].cancel():
+        job.update(status="cancelled", message="Cancelado antes de iniciar", finished_at=datetime.now())
+
+def clear_finished_jobs():
+    """Remove da sessão e do registro os jobs que já terminaram"""
+    runner = get_job_runner()
+    remaining = []
+    with runner["lock"]:
+        for job_id in st.session_state.get("job_ids", []):
+            job = runner["jobs"].get(job_id)
+            if job is None:
+                continue
+            if job["finished_at"]:
+                del runner["jobs"][job_id]
+            else:
+                remaining.append(job_id)
+    st.session_state["job_ids"] = remaining
+
+def get_session_jobs(kind):
+    """Jobs da sessão atual do tipo kind, na ordem de envio"""
+    jobs_registry = get_job_runner()["jobs"]
+    return [
+        jobs_registry[job_id]
+        for job_id in st.session_state.get("job_ids", [])
+        if job_id in jobs_registry and jobs_registry[job_id]["kind"] == kind
+    ]
+
+def render_job_status(job):
+    """Mostra o cabeçalho, o progresso e o tempo decorrido de um job"""
+    st.markdown(f"**{JOB_STATUS_LABELS[job['status']]}** · {job['description']} · `#{job['id']}`")
+    
+    start = job["started_at"] or job["created_at"]
+    elapsed = ((job["finished_at"] or datetime.now()) - start).total_seconds()
+    st.progress(job["progress"])
+    st.caption(f"{job['message']} ({elapsed:.1f}s)")
+
+def show_active_jobs(job_ids):
+    """Mostra os jobs na fila ou em execução, com cancelamento dos que estão na fila"""
+    jobs_registry = get_job_runner()["jobs"]
+    jobs = [jobs_registry[job_id] for job_id in job_ids if job_id in jobs_registry]
+    
+    # Algum job terminou: rerun completo para movê-lo à lista de concluídos
+    # (e parar o polling quando não restar nada em andamento)
+    if any(job["status"] not in ("queued", "running") for job in jobs) or len(jobs) < len(job_ids):
+        st.rerun()
+    
+    # Mais recentes primeiro
+    for job in reversed(jobs):
+        render_job_status(job)
+        if job["status"] == "queued":
+            if st.button("🚫 Cancelar", key=f"cancel_{job['id']}"):
+                cancel_job(job["id"])
+                st.rerun()
+        st.markdown("---")
+
+# Com st.fragment disponível, só os jobs em andamento são reexecutados periodicamente
+if hasattr(st, "fragment"):
+    show_active_jobs = st.fragment(run_every=JOB_POLL_SECONDS)(show_active_jobs)
+
+def show_jobs(kind, render_result):
+    """Lista os jobs da sessão do tipo kind, com status, cancelamento e resultado"""
+    jobs = get_session_jobs(kind)
+    if not jobs:
+        return
+    
+    st.subheader("🧵 Execuções em Segundo Plano")
+    
+    active_ids = [job["id"] for job in jobs if job["status"] in ("queued", "running")]
+    if active_ids:
+        show_active_jobs(active_ids)
+        # Sem st.fragment, o status só é atualizado a cada rerun
+        if not hasattr(st, "fragment") and st.button("🔄 Atualizar status", key=f"refresh_jobs_{kind}"):
+            st.rerun()
+    
+    # Concluídos ficam fora do polling: seus resultados só são renderizados em reruns completos
+    for job in reversed(jobs):
+        if job["id"] in active_ids:
+            continue
+        render_job_status(job)
+        if job["status"] == "error":
+            st.error(f"❌ {job['error']}")
+        elif job["status"] == "done":
+            render_result(job["result"], job["id"])
+        st.markdown("---")
+    
+    if len(active_ids) < len(jobs) and st.button("🧹 Limpar concluídos", key=f"clear_jobs_{kind}"):
+        clear_finished_jobs()
+        st.rerun()
 
 def main():
     st.set_page_config(
@@ -147,46 +334,67 @@ def show_file_organizer():
             return
         
         try:
+            from tasks.file_organizer import FileOrganizer
             organizer = FileOrganizer(source_folder, destination_folder)
             
-            with st.spinner("🔄 Organizando arquivos..."):
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # Simular progresso
-                for i in range(101):
-                    progress_bar.progress(i)
-                    status_text.text(f"Processando... {i}%")
-                    time_module.sleep(0.05)
-                
-                # Executar organização
-                result = organizer.organize_files(selected_types)
-                
-                progress_bar.progress(100)
-                status_text.text("✅ Organização concluída!")
-                
-                # Mostrar resultados
-                st.success("🎉 Arquivos organizados com sucesso!")
-                
-                # Estatísticas
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Arquivos Processados", result.get("total_files", 0))
-                with col2:
-                    st.metric("Arquivos Movidos", result.get("moved_files", 0))
-                with col3:
-                    st.metric("Pastas Criadas", result.get("folders_created", 0))
-                
-                # Lista de arquivos organizados
-                if result.get("organized_files"):
-                    st.subheader("📋 Arquivos Organizados")
-                    for category, files in result["organized_files"].items():
-                        with st.expander(f"{category} ({len(files)} arquivos)"):
-                            for file in files:
-                                st.write(f"• {file}")
+            # Executar organização em segundo plano
+            job_id = submit_job(
+                "organizer",
+                f"{source_folder} → {destination_folder}",
+                organizer.organize_files,
+                selected_types,
+                paths=(source_folder, destination_folder)
+            )
+            if job_id is None:
+                st.warning("⚠️ Já existe uma organização em andamento usando estas pastas. Aguarde ela terminar.")
+            else:
+                st.success("🚀 Organização iniciada em segundo plano!")
         
         except Exception as e:
             st.error(f"❌ Erro durante a organização: {str(e)}")
+    
+    show_jobs("organizer", render_organizer_result)
+
+def render_organizer_result(result, job_id):
+    """Mostra as estatísticas de uma organização concluída"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Arquivos Processados", result.get("total_files", 0))
+    with col2:
+        st.metric("Arquivos Movidos", result.get("moved_files", 0))
+    with col3:
+        st.metric("Pastas Criadas", result.get("folders_created", 0))
+    
+    # Lista de arquivos organizados
+    if result.get("organized_files"):
+        st.subheader("📋 Arquivos Organizados")
+        for category, files in result["organized_files"].items():
+            with st.expander(f"{category} ({len(files)} arquivos)"):
+                for file in files:
+                    st.write(f"• {file}")
+
+# Arquivo de tarefas lido pelo TaskScheduler (relativo ao diretório de execução)
+SCHEDULED_TASKS_FILE = "scheduled_tasks.json"
+
+@st.cache_resource
+def get_scheduler_lock():
+    """Trava que serializa o acesso das sessões ao agendador compartilhado"""
+    return threading.Lock()
+
+@st.cache_resource(max_entries=1)
+def load_scheduler(tasks_file_mtime):
+    """Agendador do processo, recriado quando o arquivo de tarefas muda"""
+    from tasks.scheduler import TaskScheduler
+    return TaskScheduler()
+
+def get_scheduler():
+    """Agendador mantido entre reruns; use sempre com get_scheduler_lock()"""
+    # Recarregar quando outro processo (ex.: exemplo_uso.py) altera o arquivo
+    try:
+        tasks_file_mtime = os.stat(SCHEDULED_TASKS_FILE).st_mtime_ns
+    except OSError:
+        tasks_file_mtime = None
+    return load_scheduler(tasks_file_mtime)
 
 def show_task_scheduler():
     st.header("⏰ Agendamento de Tarefas")
@@ -241,25 +449,18 @@ def show_task_scheduler():
         repeat_daily = st.checkbox("🔄 Repetir diariamente")
     
     # Tarefas agendadas
-    st.subheader("📋 Tarefas Agendadas")
-    
-    # Simular tarefas existentes
-    scheduled_tasks = [
-        {
-            "name": "Abrir Gmail",
-            "type": "🌐 Abrir Site",
-            "target": "https://gmail.com",
-            "time": "09:00",
-            "status": "🟢 Ativo"
-        },
-        {
-            "name": "Abrir Notepad",
-            "type": "💻 Abrir Aplicativo",
-            "target": "notepad.exe",
-            "time": "14:30",
-            "status": "🟡 Pausado"
-        }
-    ]
+    st.subheader("📋 Tarefas Ativas")
+    
+    # Tarefas existentes, lidas do agendador compartilhado entre reruns
+    try:
+        with get_scheduler_lock():
+            scheduled_tasks = get_scheduler().get_active_tasks()
+    except Exception as e:
+        st.error(f"❌ Erro ao carregar tarefas agendadas: {str(e)}")
+        return
+    
+    if not scheduled_tasks:
+        st.info("Nenhuma tarefa ativa.")
     
     # Mostrar tarefas existentes
     for i, task in enumerate(scheduled_tasks):
@@ -272,9 +473,9 @@ def show_task_scheduler():
         with col3:
             st.write(task['target'])
         with col4:
-            st.write(task['time'])
+            st.write(task['schedule_time'])
         with col5:
-            st.write(task['status'])
+            st.write("🟢 Ativo")
     
     st.markdown("---")
     
@@ -285,20 +486,14 @@ def show_task_scheduler():
             return
         
         try:
-            scheduler = TaskScheduler()
-            
-            with st.spinner("🔄 Adicionando tarefa..."):
-                # Simular adição
-                time_module.sleep(1)
-                
-                # Adicionar à lista
-                scheduled_tasks.append({
-                    "name": task_name,
-                    "type": task_type,
-                    "target": target,
-                    "time": schedule_time.strftime("%H:%M"),
-                    "status": "🟢 Ativo"
-                })
+            with st.spinner("🔄 Adicionando tarefa..."), get_scheduler_lock():
+                get_scheduler().add_task(
+                    task_name,
+                    task_type,
+                    target,
+                    schedule_time,
+                    repeat_daily
+                )
             
             st.success("✅ Tarefa adicionada com sucesso!")
             st.rerun()
@@ -306,6 +501,12 @@ def show_task_scheduler():
         except Exception as e:
             st.error(f"❌ Erro ao adicionar tarefa: {str(e)}")
 
+# Tipos MIME usados no download dos relatórios
+REPORT_MIME_TYPES = {
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv"
+}
+
 def show_report_generator():
     st.header("📊 Geração de Relatórios")
     st.markdown("Gere relatórios fictícios em Excel ou CSV para demonstração.")
@@ -360,49 +561,66 @@ def show_report_generator():
     # Executar geração
     if st.button("🚀 Gerar Relatório", type="primary"):
         try:
+            from tasks.report_generator import ReportGenerator
             generator = ReportGenerator()
             
-            with st.spinner("🔄 Gerando relatório..."):
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                # Simular progresso
-                for i in range(101):
-                    progress_bar.progress(i)
-                    status_text.text(f"Gerando relatório... {i}%")
-                    time_module.sleep(0.03)
-                
-                # Gerar relatório
-                result = generator.generate_report(
-                    report_type=report_type,
-                    file_format=file_format,
-                    num_records=num_records,
-                    start_date=start_date,
-                    end_date=end_date,
-                    include_charts=include_charts,
-                    include_summary=include_summary
-                )
-                
-                progress_bar.progress(100)
-                status_text.text("✅ Relatório gerado com sucesso!")
-            
-            st.success("🎉 Relatório gerado com sucesso!")
-            
-            # Mostrar informações do arquivo
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Arquivo Gerado", result.get("filename", "N/A"))
-            with col2:
-                st.metric("Tamanho", result.get("file_size", "N/A"))
-            with col3:
-                st.metric("Registros", num_records)
-            
-            # Botão para download
-            if st.button("📥 Baixar Relatório"):
-                st.info("📁 Arquivo salvo em: " + result.get("file_path", "N/A"))
+            # Gerar relatório em segundo plano
+            submit_job(
+                "report",
+                f"{report_type} · {num_records} registros",
+                generator.generate_report,
+                report_type=report_type,
+                file_format=file_format,
+                num_records=num_records,
+                start_date=start_date,
+                end_date=end_date,
+                include_charts=include_charts,
+                include_summary=include_summary
+            )
+            st.success("🚀 Geração do relatório iniciada em segundo plano!")
         
         except Exception as e:
             st.error(f"❌ Erro ao gerar relatório: {str(e)}")
+    
+    show_jobs("report", render_report_result)
+
+def render_report_result(result, job_id):
+    """Mostra as informações de um relatório gerado e o botão de download"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Arquivo Gerado", result.get("filename", "N/A"))
+    with col2:
+        st.metric("Tamanho", result.get("file_size", "N/A"))
+    with col3:
+        st.metric("Registros", result.get("records", "N/A"))
+    
+    # Botão para download
+    file_path = result.get("file_path")
+    if file_path and os.path.exists(file_path):
+        file_name = result.get("filename") or os.path.basename(file_path)
+        mime = REPORT_MIME_TYPES.get(os.path.splitext(file_name)[1].lower(), "application/octet-stream")
+        with open(file_path, "rb") as report_file:
+            st.download_button(
+                "📥 Baixar Relatório",
+                data=report_file,
+                file_name=file_name,
+                mime=mime,
+                key=f"download_{job_id}"
+            )
+        st.caption("📁 Arquivo salvo em: " + file_path)
+    else:
+        st.warning("⚠️ Arquivo do relatório não encontrado: " + str(file_path))
+
+@st.cache_resource
+def get_form_fill_lock():
+    """Trava única do processo: só um preenchimento por vez controla a tela"""
+    return threading.Lock()
+
+@st.cache_resource
+def get_form_filler():
+    """Preenchedor único do processo; use sempre com get_form_fill_lock()"""
+    from tasks.form_filler import FormFiller
+    return FormFiller()
 
 def show_form_filler():
     st.header("📝 Preenchimento de Formulários")
@@ -481,7 +699,7 @@ def show_form_filler():
     with col1:
         if st.button("🚀 Iniciar Preenchimento", type="primary"):
             try:
-                filler = FormFiller()
+                filler = get_form_filler()
                 
                 # Dados para preencher
                 form_data = {
@@ -494,27 +712,31 @@ def show_form_filler():
                     "mensagem": mensagem
                 }
                 
-                with st.spinner("🔄 Preenchendo formulário..."):
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    # Simular progresso
-                    for i in range(101):
-                        progress_bar.progress(i)
-                        status_text.text(f"Preenchendo... {i}%")
-                        time_module.sleep(0.02)
-                    
-                    # Executar preenchimento
-                    result = filler.fill_form(
-                        form_type=form_type,
-                        form_data=form_data,
-                        delay=delay,
-                        auto_submit=auto_submit,
-                        preview_mode=preview_mode
-                    )
-                    
-                    progress_bar.progress(100)
-                    status_text.text("✅ Preenchimento concluído!")
+                # Tela e teclado são únicos: recusar se outra sessão já estiver preenchendo
+                form_fill_lock = get_form_fill_lock()
+                if not form_fill_lock.acquire(blocking=False):
+                    st.warning("⚠️ Já existe um preenchimento em andamento. Aguarde ele terminar.")
+                    return
+                
+                try:
+                    with st.spinner("🔄 Preenchendo formulário..."):
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        status_text.text("Preenchendo...")
+                        
+                        # Executar preenchimento
+                        result = filler.fill_form(
+                            form_type=form_type,
+                            form_data=form_data,
+                            delay=delay,
+                            auto_submit=auto_submit,
+                            preview_mode=preview_mode
+                        )
+                        
+                        progress_bar.progress(100)
+                        status_text.text("✅ Preenchimento concluído!")
+                finally:
+                    form_fill_lock.release()
                 
                 st.success("🎉 Formulário preenchido com sucesso!")
                 
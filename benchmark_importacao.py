@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de tempo de importação do Automatizador de Tarefas
+Mede, com `python -X importtime`, o custo de cold start do app.py e de cada
+módulo de tarefas, que agora só é pago quando a página correspondente precisa dele,
+e, com o AppTest do Streamlit, o custo da primeira visita, do primeiro clique no
+botão principal e de cada rerun por página
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+# Módulos medidos, na ordem em que aparecem no menu
+MODULOS = [
+    ("app", "🏠 app.py (cold start)"),
+    ("tasks.file_organizer", "📁 Organização de Arquivos"),
+    ("tasks.scheduler", "⏰ Agendamento de Tarefas"),
+    ("tasks.report_generator", "📊 Geração de Relatórios"),
+    ("tasks.form_filler", "📝 Preenchimento de Formulários"),
+]
+
+# Páginas do menu lateral do app.py e o botão que dispara a importação adiada.
+# A página de agendamento importa tasks.scheduler já ao abrir, e seu botão
+# alteraria o scheduled_tasks.json real, por isso não é clicado.
+PAGINAS = [
+    ("🏠 Página Inicial", None),
+    ("📁 Organização de Arquivos", "🚀 Organizar Arquivos"),
+    ("⏰ Agendamento de Tarefas", None),
+    ("📊 Geração de Relatórios", "🚀 Gerar Relatório"),
+    ("📝 Preenchimento de Formulários", "🚀 Iniciar Preenchimento"),
+]
+
+# Linha do -X importtime: "import time: self [us] | cumulative | nome"
+LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+def medir_importacao(modulo):
+    """Retorna o tempo cumulativo (ms) de importar `modulo` num processo limpo"""
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if resultado.returncode != 0:
+        erro = resultado.stderr.strip().splitlines()
+        raise RuntimeError(erro[-1] if erro else "falha ao importar")
+
+    # O tempo cumulativo da linha do próprio módulo inclui suas dependências
+    total_us = 0
+    for linha in resultado.stderr.splitlines():
+        match = LINHA_IMPORTTIME.match(linha)
+        if match and match.group(3) == modulo:
+            total_us = int(match.group(2))
+    return total_us / 1000
+
+def preparar_pagina(app, pagina, pasta_temp):
+    """Ajusta os campos da página para que o clique não mexa em dados reais"""
+    if pagina == "📁 Organização de Arquivos":
+        # Organizar uma pasta vazia em vez de ~/Downloads
+        for campo, subpasta in (("📂 Pasta de Origem:", "origem"), ("📁 Pasta de Destino:", "destino")):
+            caminho = os.path.join(pasta_temp, subpasta)
+            os.makedirs(caminho, exist_ok=True)
+            next(w for w in app.text_input if w.label == campo).set_value(caminho)
+    elif pagina == "📝 Preenchimento de Formulários":
+        # Modo preview: nada é digitado na tela
+        next(w for w in app.checkbox if w.label == "👁️ Modo preview").check()
+        next(w for w in app.slider if w.label.startswith("⏱️ Delay")).set_value(0.1)
+
+def medir_reruns(pagina, botao, repeticoes, pasta_temp):
+    """Retorna (primeira visita, primeiro clique, mediana dos reruns, erro) em ms"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"),
+        default_timeout=60
+    )
+    app.run()
+    app.sidebar.selectbox[0].select(pagina)
+
+    # A primeira visita só renderiza a página; os módulos importados nos
+    # handlers dos botões ficam para o primeiro clique
+    inicio = time.perf_counter()
+    app.run()
+    primeira = (time.perf_counter() - inicio) * 1000
+
+    # Primeiro clique: importação adiada + execução do handler
+    clique = None
+    if botao:
+        preparar_pagina(app, pagina, pasta_temp)
+        next(w for w in app.button if w.label == botao).click()
+        inicio = time.perf_counter()
+        app.run()
+        clique = (time.perf_counter() - inicio) * 1000
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        app.run()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+
+    erro = app.exception[0].message if app.exception else None
+    return primeira, clique, tempos[len(tempos) // 2], erro
+
+def main():
+    """Função principal do benchmark"""
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    if repeticoes < 1:
+        print("❌ O número de repetições deve ser pelo menos 1")
+        sys.exit(1)
+
+    print("⏱️ BENCHMARK DE IMPORTAÇÃO")
+    print("=" * 60)
+    print(f"Repetições por módulo: {repeticoes} (mediana)")
+    print()
+
+    for modulo, descricao in MODULOS:
+        try:
+            tempos = sorted(medir_importacao(modulo) for _ in range(repeticoes))
+            mediana = tempos[len(tempos) // 2]
+            print(f"{descricao:<40} {mediana:>10.1f} ms")
+        except RuntimeError as e:
+            print(f"{descricao:<40} ❌ {e}")
+
+    print()
+    print("🔄 CUSTO POR RERUN (AppTest)")
+    print("=" * 60)
+    print(f"{'Página':<40} {'1ª visita':>10} {'1º clique':>10} {'rerun':>10}")
+
+    try:
+        import streamlit.testing.v1  # noqa: F401
+    except ImportError as e:
+        print(f"❌ {e}")
+        return
+
+    # Os módulos ficam em sys.modules entre páginas: dependências comuns (ex.:
+    # pandas) só pesam na primeira página que as importa
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        for pagina, botao in PAGINAS:
+            primeira, clique, rerun, erro = medir_reruns(pagina, botao, repeticoes, pasta_temp)
+            clique = f"{clique:>7.1f} ms" if clique is not None else f"{'-':>10}"
+            print(f"{pagina:<40} {primeira:>7.1f} ms {clique} {rerun:>7.1f} ms")
+            if erro:
+                print(f"    ⚠️ {erro}")
+
+if __name__ == "__main__":
+    main()